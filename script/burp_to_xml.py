@@ -1,21 +1,71 @@
 #!/usr/bin/env python3
 import argparse
-import base64
 import gzip
 import io
+import mmap
 import os
+import queue
 import re
+import shutil
 import sqlite3
 import tempfile
+import threading
 import zipfile
-from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Any, BinaryIO, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from urllib.parse import urlparse
+from urllib.request import pathname2url
 from xml.etree import ElementTree as ET
 from xml.sax.saxutils import escape
 
+try:
+    from lxml import etree as ET_fast  # type: ignore[import-untyped]
+
+    ISSUE_PARSER = ET_fast.XMLParser(remove_comments=True, remove_pis=True, huge_tree=True)
+except ImportError:
+    from xml.etree import ElementTree as ET_fast
+
+    ISSUE_PARSER = None
+
+try:
+    from pybase64 import b64encode, b64encode_as_string
+except ImportError:
+    from base64 import b64encode  # type: ignore[assignment]
+
+    def b64encode_as_string(data: bytes) -> str:  # type: ignore[misc]
+        return b64encode(data).decode("ascii")
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore[assignment]
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None  # type: ignore[assignment]
+
 SQLITE_MAGIC = b"SQLite format 3\0"
 GZIP_MAGIC = b"\x1f\x8b"
 ZIP_MAGIC = b"PK\x03\x04"
+PAYLOAD_HEAD_SIZE = 16
+PAYLOAD_SCAN_SIZE = 64 * 1024
+SQLITE_FETCH_SIZE = 8192
+SQLITE_READ_PRAGMAS = (
+    "PRAGMA mmap_size=30000000000",
+    "PRAGMA cache_size=-262144",
+    "PRAGMA temp_store=MEMORY",
+)
+OUTPUT_BUFFER_SIZE = 4 * 1024 * 1024
+PARALLEL_GROUP_SIZE = 64
+WRITER_QUEUE_SIZE = 64
+WRITER_FRAGMENT_SIZE = 256 * 1024
+START_SCAN_WINDOW = 4 * 1024 * 1024
+XML_DECLARATION = b'<?xml version="1.0" encoding="utf-8"?>\n'
 HTTP_METHODS = (
     b"GET",
     b"POST",
@@ -27,32 +77,73 @@ HTTP_METHODS = (
     b"CONNECT",
     b"TRACE",
 )
-REQUEST_START_RE = re.compile(
-    rb"(?:^|[\r\n])(" + b"|".join(HTTP_METHODS) + rb")\s+[^\r\n]{1,2048}\s+HTTP/\d(?:\.\d)?",
-    re.IGNORECASE,
+HTTP_LINE_PATTERN = (
+    rb"(?P<req>(?:" + b"|".join(HTTP_METHODS) + rb")\s+[^\r\n]{1,2048}\s+HTTP/\d(?:\.\d)?)"
+    rb"|(?P<resp>HTTP/\d(?:\.\d)?\s+\d{3}[^\r\n]*)"
 )
-RESPONSE_START_RE = re.compile(rb"(?:^|[\r\n])HTTP/\d(?:\.\d)?\s+\d{3}[^\r\n]*", re.IGNORECASE)
+HTTP_START_RE = re.compile(rb"(?:^|[\r\n])(?:" + HTTP_LINE_PATTERN + rb")", re.IGNORECASE)
+HTTP_LINE_RE = re.compile(HTTP_LINE_PATTERN, re.IGNORECASE)
+if hyperscan is not None:
+    # Streaming prefilter for HTTP_START_RE. The patterns drop the leading
+    # newline/anchor and the {1,2048} bound (slow to compile) so they report a
+    # superset of its matches; \s is spelled out to keep Python's bytes semantics.
+    HTTP_START_HS = hyperscan.Database(mode=hyperscan.HS_MODE_STREAM | hyperscan.HS_MODE_SOM_HORIZON_LARGE)
+    HTTP_START_HS.compile(
+        expressions=[
+            rb"(?:" + b"|".join(HTTP_METHODS) + rb")[ \t\n\r\f\v]+[^\r\n]+[ \t\n\r\f\v]+HTTP/\d",
+            rb"HTTP/\d(?:\.\d)?[ \t\n\r\f\v]+\d{3}",
+        ],
+        ids=[0, 1],
+        elements=2,
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST] * 2,
+    )
+else:
+    HTTP_START_HS = None
 ISSUE_BLOCK_RE = re.compile(br"<issue\b[^>]*>.*?</issue>", re.IGNORECASE | re.DOTALL)
 SAFE_TAG_RE = re.compile(r"^[A-Za-z_][\w\-.]*$")
 PRINTABLE_BYTES = set(b"\t\r\n") | set(range(32, 127))
+NON_PRINTABLE_BYTES = bytes(b for b in range(256) if b not in PRINTABLE_BYTES)
+PRINTABLE_SAMPLE_SIZE = 64 * 1024
+PRINTABLE_LUT_MIN_SIZE = 16 * 1024
+PRINTABLE_PROBE_SIZE = 1024
+if np is not None:
+    PRINTABLE_LUT = np.zeros(256, dtype=np.uint8)
+    PRINTABLE_LUT[sorted(PRINTABLE_BYTES)] = 1
+URL_SPECIAL_RE = re.compile(r"[@\[\]#;%]")
 XML_INVALID_RE = re.compile(r"[\x00-\x08\x0B\x0C\x0E-\x1F]")
+XML_INVALID_TABLE = dict.fromkeys([*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20)])
+ByteBuffer = Union[bytes, bytearray, mmap.mmap]
+REQUEST_META_TAGS = tuple(
+    (name, f"    <{name}>".encode("ascii"), f"</{name}>\n".encode("ascii"))
+    for name in ("url", "host", "port", "protocol", "method", "path")
+)
 
 
-def detect_payload(raw: bytes) -> Tuple[str, bytes]:
-    if raw.startswith(GZIP_MAGIC):
-        with gzip.GzipFile(fileobj=io.BytesIO(raw)) as gz:
-            raw = gz.read()
-    if raw.startswith(ZIP_MAGIC):
-        return "zip", raw
-    if raw.startswith(SQLITE_MAGIC):
-        return "sqlite", raw
-    if raw.lstrip().startswith(b"<?xml") or raw.lstrip().startswith(b"<"):
-        return "xml", raw
-    return "unknown", raw
+def is_gzip_stream(f: io.BufferedIOBase) -> bool:
+    try:
+        return f.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+    finally:
+        f.seek(0)
 
 
-def extract_xml_from_zip(raw: bytes) -> Optional[bytes]:
-    with zipfile.ZipFile(io.BytesIO(raw)) as zf:
+def detect_payload(f: io.BufferedIOBase) -> str:
+    head = f.read(PAYLOAD_HEAD_SIZE)
+    try:
+        if head.startswith(ZIP_MAGIC):
+            return "zip"
+        if head.startswith(SQLITE_MAGIC):
+            return "sqlite"
+        text = head.lstrip()
+        while head and not text:
+            head = f.read(PAYLOAD_SCAN_SIZE)
+            text = head.lstrip()
+        return "xml" if text.startswith(b"<") else "unknown"
+    finally:
+        f.seek(0)
+
+
+def extract_xml_from_zip(source: io.BufferedIOBase) -> Optional[bytes]:
+    with zipfile.ZipFile(source) as zf:
         xml_candidates = [n for n in zf.namelist() if n.lower().endswith(".xml")]
         if not xml_candidates:
             return None
@@ -60,6 +151,14 @@ def extract_xml_from_zip(raw: bytes) -> Optional[bytes]:
             return xml_file.read()
 
 
+def open_sqlite_readonly(path: str) -> sqlite3.Connection:
+    # immutable=1 skips locking and change detection; the export never writes.
+    conn = sqlite3.connect(f"file:{pathname2url(os.path.abspath(path))}?mode=ro&immutable=1", uri=True)
+    for pragma in SQLITE_READ_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
 def iter_tables(conn: sqlite3.Connection, only_tables: Optional[List[str]]) -> Iterable[str]:
     cursor = conn.execute(
         "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
@@ -72,60 +171,84 @@ def iter_tables(conn: sqlite3.Connection, only_tables: Optional[List[str]]) -> I
 
 
 def write_sqlite_as_xml(conn: sqlite3.Connection, output_path: str, only_tables: Optional[List[str]]) -> None:
-    with open(output_path, "w", encoding="utf-8") as out:
-        out.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        out.write('<burpProject source="sqlite">\n')
+    with open(output_path, "wb", buffering=OUTPUT_BUFFER_SIZE) as out:
+        out.write(XML_DECLARATION)
+        out.write(b'<burpProject source="sqlite">\n')
         for table in iter_tables(conn, only_tables):
-            out.write(f'  <table name="{escape(table)}">\n')
+            out.write(f'  <table name="{escape(table)}">\n'.encode("utf-8"))
             columns = [col[1] for col in conn.execute(f"PRAGMA table_info('{table}')").fetchall()]
+            escaped_cols = [escape(col_name) for col_name in columns]
+            null_cols = [f'      <col name="{name}" null="true"/>\n'.encode("utf-8") for name in escaped_cols]
+            blob_prefixes = [f'      <col name="{name}" encoding="base64">'.encode("utf-8") for name in escaped_cols]
+            text_prefixes = [f'      <col name="{name}">'.encode("utf-8") for name in escaped_cols]
             cursor = conn.execute(f"SELECT * FROM '{table}'")
-            for row in cursor:
-                out.write("    <row>\n")
-                for col_name, value in zip(columns, row):
-                    if value is None:
-                        out.write(f'      <col name="{escape(col_name)}" null="true"/>\n')
-                        continue
-                    if isinstance(value, bytes):
-                        encoded = base64.b64encode(value).decode("ascii")
-                        out.write(
-                            f'      <col name="{escape(col_name)}" encoding="base64">{encoded}</col>\n'
-                        )
-                        continue
-                    out.write(
-                        f'      <col name="{escape(col_name)}">{escape(str(value))}</col>\n'
-                    )
-                out.write("    </row>\n")
-            out.write("  </table>\n")
-        out.write("</burpProject>\n")
+            while True:
+                rows = cursor.fetchmany(SQLITE_FETCH_SIZE)
+                if not rows:
+                    break
+                parts: List[bytes] = []
+                parts_append = parts.append
+                for row in rows:
+                    parts_append(b"    <row>\n")
+                    for idx, value in enumerate(row):
+                        if value is None:
+                            parts_append(null_cols[idx])
+                        elif isinstance(value, bytes):
+                            parts_append(blob_prefixes[idx])
+                            parts_append(b64encode(value))
+                            parts_append(b"</col>\n")
+                        else:
+                            parts_append(text_prefixes[idx])
+                            parts_append(escape(str(value)).encode("utf-8"))
+                            parts_append(b"</col>\n")
+                    parts_append(b"    </row>\n")
+                out.write(b"".join(parts))
+            out.write(b"  </table>\n")
+        out.write(b"</burpProject>\n")
+
+
+def map_input(f: io.BufferedReader) -> Optional[mmap.mmap]:
+    try:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # Pipes and empty files cannot be mapped.
+        return None
 
 
 def iter_issue_blocks(file_path: str, chunk_size: int = 4 * 1024 * 1024) -> Iterator[bytes]:
-    buffer = b""
+    buffer = bytearray()
     tail_keep = chunk_size
     with open(file_path, "rb") as f:
+        view = map_input(f)
+        if view is not None:
+            with view:
+                for match in ISSUE_BLOCK_RE.finditer(view):
+                    yield view[match.start():match.end()]
+            return
         while True:
             chunk = f.read(chunk_size)
             if not chunk:
                 break
-            buffer += chunk
+            buffer.extend(chunk)
             last_end = 0
             for match in ISSUE_BLOCK_RE.finditer(buffer):
-                yield match.group(0)
+                yield bytes(match.group(0))
                 last_end = match.end()
             if last_end:
-                buffer = buffer[last_end:]
+                del buffer[:last_end]
             if len(buffer) > tail_keep:
-                buffer = buffer[-tail_keep:]
+                del buffer[:-tail_keep]
 
 
 def decode_issue_xml(block: bytes) -> Optional[ET.Element]:
     try:
-        text = block.decode("utf-8")
-    except UnicodeDecodeError:
-        text = block.decode("latin-1", "replace")
+        return ET_fast.fromstring(block, ISSUE_PARSER)
+    except ET_fast.ParseError:
+        pass
+    # Not valid UTF-8 (or malformed): retry once as latin-1 text.
     try:
-        return ET.fromstring(text)
-    except ET.ParseError:
+        return ET_fast.fromstring(block.decode("latin-1"), ISSUE_PARSER)
+    except ET_fast.ParseError:
         return None
 
 
@@ -133,8 +256,8 @@ def issue_text(element: ET.Element) -> str:
     return "".join(element.itertext()).strip()
 
 
-def collect_issues(file_path: str, limit: Optional[int]) -> List[Dict[str, str]]:
-    issues: List[Dict[str, str]] = []
+def iter_issues(file_path: str, limit: Optional[int]) -> Iterator[Dict[str, str]]:
+    count = 0
     for block in iter_issue_blocks(file_path):
         element = decode_issue_xml(block)
         if element is None:
@@ -144,54 +267,94 @@ def collect_issues(file_path: str, limit: Optional[int]) -> List[Dict[str, str]]
             value = issue_text(child)
             if value:
                 issue[child.tag] = value
-        raw_b64 = base64.b64encode(block).decode("ascii")
+        raw_b64 = b64encode_as_string(block)
         issue["raw"] = raw_b64
-        if issue:
-            issues.append(issue)
-        if limit is not None and len(issues) >= limit:
-            break
-    return issues
-
-
-def parse_headers(header_bytes: bytes) -> Tuple[str, Dict[str, str]]:
-    lines = header_bytes.splitlines()
-    if not lines:
-        return "", {}
-    first_line = lines[0].decode("latin-1", "replace").strip()
+        count += 1
+        yield issue
+        if limit is not None and count >= limit:
+            return
+
+
+def parse_headers(header_bytes: Union[bytes, bytearray]) -> Tuple[str, Dict[str, str]]:
+    # One latin-1 decode for the whole block; CR and CRLF are folded to LF so the
+    # line split matches bytes.splitlines().
+    text = header_bytes.decode("latin-1")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    first_line, _, rest = text.partition("\n")
     headers: Dict[str, str] = {}
-    for line in lines[1:]:
-        if not line.strip():
-            continue
-        if b":" not in line:
-            continue
-        name, value = line.split(b":", 1)
-        headers[name.decode("latin-1", "replace").strip().lower()] = value.decode("latin-1", "replace").strip()
-    return first_line, headers
+    for line in rest.split("\n"):
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    return first_line.strip(), headers
+
+
+def count_printable_bytes(data):
+    # Numba kernel (see numba_kernel). Branch-free body so LLVM can vectorise the loop.
+    count = 0
+    for i in range(data.shape[0]):
+        byte = data[i]
+        count += ((32 <= byte) & (byte < 127)) | (byte == 9) | (byte == 10) | (byte == 13)
+    return count
+
+
+@lru_cache(maxsize=None)
+def numba_kernel(func: Callable[..., int]) -> Optional[Callable[..., int]]:
+    # Importing Numba costs ~0.2 s and ~90 MB, so kernels are compiled on first
+    # use; XML, ZIP and SQLite inputs never load it.
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+    return njit(cache=True)(func)
 
 
-def split_http_message(message: bytes) -> Tuple[bytes, bytes]:
-    header_end = message.find(b"\r\n\r\n")
-    header_sep = 4
-    if header_end == -1:
-        header_end = message.find(b"\n\n")
-        header_sep = 2
-    if header_end == -1:
-        return message, b""
-    return message[:header_end], message[header_end + header_sep:]
+def count_printable(data: bytes) -> int:
+    kernel = numba_kernel(count_printable_bytes)
+    if kernel is not None:
+        return int(kernel(np.frombuffer(data, dtype=np.uint8)))
+    if np is not None and len(data) >= PRINTABLE_LUT_MIN_SIZE:
+        # translate() gets slower with every byte it deletes while the LUT gather
+        # does not, so the gather only pays off on large, mostly binary samples.
+        head = bytes(data[:PRINTABLE_PROBE_SIZE]).translate(None, NON_PRINTABLE_BYTES)
+        if len(head) < PRINTABLE_PROBE_SIZE // 2:
+            rest = np.frombuffer(data, dtype=np.uint8, offset=PRINTABLE_PROBE_SIZE)
+            return len(head) + int(np.count_nonzero(PRINTABLE_LUT[rest]))
+    return len(bytes(data).translate(None, NON_PRINTABLE_BYTES))
 
 
 def is_mostly_printable(data: bytes, threshold: float = 0.9) -> bool:
     if not data:
         return True
-    printable = sum(1 for b in data if b in PRINTABLE_BYTES)
-    return (printable / len(data)) >= threshold
+    size = len(data)
+    if size > 3 * PRINTABLE_SAMPLE_SIZE:
+        # Large bodies: the ratio only has to clear the threshold, so sampling
+        # the head, middle and tail is enough.
+        mid = (size - PRINTABLE_SAMPLE_SIZE) // 2
+        samples = (
+            data[:PRINTABLE_SAMPLE_SIZE],
+            data[mid:mid + PRINTABLE_SAMPLE_SIZE],
+            data[-PRINTABLE_SAMPLE_SIZE:],
+        )
+        printable = sum(count_printable(sample) for sample in samples)
+        return (printable / (3 * PRINTABLE_SAMPLE_SIZE)) >= threshold
+    return (count_printable(data) / size) >= threshold
 
 
-def sanitize_xml_text(text: str) -> str:
-    return XML_INVALID_RE.sub("", text)
+def xml_text(text: str) -> bytes:
+    # Sanitize, escape and encode in as few passes as possible. translate()
+    # only has a fast path for ASCII strings with 1:1 mappings, so entity
+    # replacement stays with escape() and non-ASCII text uses the regex.
+    if text.isascii():
+        text = text.translate(XML_INVALID_TABLE)
+        if "&" in text or "<" in text or ">" in text:
+            text = escape(text)
+        return text.encode("ascii")
+    return escape(XML_INVALID_RE.sub("", text)).encode("utf-8")
 
 
-def parse_chunked_end(buffer: bytes, start: int) -> Optional[int]:
+def parse_chunked_end_py(buffer: ByteBuffer, start: int) -> Optional[int]:
     idx = start
     while True:
         line_end = buffer.find(b"\r\n", idx)
@@ -206,6 +369,8 @@ def parse_chunked_end(buffer: bytes, start: int) -> Optional[int]:
             size = int(size_line, 16)
         except ValueError:
             return None
+        if size < 0:
+            return None
         idx = line_end + line_break
         if len(buffer) < idx + size + line_break:
             return None
@@ -220,31 +385,112 @@ def parse_chunked_end(buffer: bytes, start: int) -> Optional[int]:
             return idx
 
 
-def find_next_http_start(buffer: bytes) -> Optional[Tuple[int, str]]:
-    req_match = REQUEST_START_RE.search(buffer)
-    resp_match = RESPONSE_START_RE.search(buffer)
-    matches = []
-    if req_match:
-        matches.append((req_match.start(), "request"))
-    if resp_match:
-        matches.append((resp_match.start(), "response"))
-    if not matches:
-        return None
-    start, kind = min(matches, key=lambda item: item[0])
-    while start < len(buffer) and buffer[start] in (10, 13):
-        start += 1
-    return start, kind
+def scan_chunked_end(data, start):
+    # Mirrors parse_chunked_end_py on a uint8 array. Returns the end offset,
+    # -1 for "incomplete/invalid" and -2 for size lines that need Python's
+    # int() (signs, underscores, more than 15 hex digits).
+    n = data.shape[0]
+    idx = start
+    while True:
+        line_end = -1
+        line_break = 2
+        j = idx
+        while j + 1 < n:
+            if data[j] == 13 and data[j + 1] == 10:
+                line_end = j
+                break
+            j += 1
+        if line_end == -1:
+            line_break = 1
+            j = idx
+            while j < n:
+                if data[j] == 10:
+                    line_end = j
+                    break
+                j += 1
+        if line_end == -1:
+            return -1
+        lo = idx
+        hi = lo
+        while hi < line_end and data[hi] != 59:
+            hi += 1
+        while lo < hi and (data[lo] == 32 or 9 <= data[lo] <= 13):
+            lo += 1
+        while hi > lo and (data[hi - 1] == 32 or 9 <= data[hi - 1] <= 13):
+            hi -= 1
+        if lo < hi and (data[lo] == 43 or data[lo] == 45):
+            return -2
+        if hi - lo >= 2 and data[lo] == 48 and (data[lo + 1] == 120 or data[lo + 1] == 88):
+            lo += 2
+        if lo == hi:
+            return -1
+        if hi - lo > 15:
+            return -2
+        size = 0
+        for k in range(lo, hi):
+            c = data[k]
+            if 48 <= c <= 57:
+                size = size * 16 + (c - 48)
+            elif 97 <= c <= 102:
+                size = size * 16 + (c - 87)
+            elif 65 <= c <= 70:
+                size = size * 16 + (c - 55)
+            elif c == 95:
+                return -2
+            else:
+                return -1
+        idx = line_end + line_break
+        if n < idx + size + line_break:
+            return -1
+        idx += size
+        if idx + 2 <= n and data[idx] == 13 and data[idx + 1] == 10:
+            idx += 2
+        elif idx < n and data[idx] == 10:
+            idx += 1
+        else:
+            return -1
+        if size == 0:
+            return idx
+
+
+def parse_chunked_end(buffer: ByteBuffer, start: int) -> Optional[int]:
+    kernel = numba_kernel(scan_chunked_end)
+    if kernel is None:
+        return parse_chunked_end_py(buffer, start)
+    end = kernel(np.frombuffer(buffer, dtype=np.uint8), start)
+    if end == -2:
+        return parse_chunked_end_py(buffer, start)
+    return None if end < 0 else int(end)
 
 
-def extract_http_message(buffer: bytes) -> Optional[Tuple[bytes, str, Dict[str, str], bytes]]:
-    found = find_next_http_start(buffer)
-    if not found:
+def find_next_http_start(buffer: ByteBuffer, pos: int = 0) -> Optional[Tuple[int, str]]:
+    match = HTTP_START_RE.search(buffer, pos)
+    if not match:
         return None
-    start, _ = found
-    header_end = buffer.find(b"\r\n\r\n", start)
+    # The named group starts right after the newline (if any) the match began on.
+    if match.group("req") is not None:
+        return match.start("req"), "request"
+    return match.start("resp"), "response"
+
+
+def extract_http_message(
+    buffer: ByteBuffer, start: int, header_cache: Optional[List[int]] = None
+) -> Optional[Tuple[str, Dict[str, str], int]]:
+    # header_cache holds the first CRLFCRLF and LFLF at or after an earlier
+    # start in an unchanging buffer (-1 if there is none, -2 if not looked up
+    # yet), so failed or LF-only messages do not rescan the rest of the buffer
+    # for every start. [-1, -1] after a failed call means no header terminator
+    # follows start at all.
+    if header_cache is None:
+        header_cache = [-2, -2]
+    if header_cache[0] == -2 or 0 <= header_cache[0] < start:
+        header_cache[0] = buffer.find(b"\r\n\r\n", start)
+    header_end = header_cache[0]
     header_sep = 4
     if header_end == -1:
-        header_end = buffer.find(b"\n\n", start)
+        if header_cache[1] == -2 or 0 <= header_cache[1] < start:
+            header_cache[1] = buffer.find(b"\n\n", start)
+        header_end = header_cache[1]
         header_sep = 2
     if header_end == -1:
         return None
@@ -254,7 +500,7 @@ def extract_http_message(buffer: bytes) -> Optional[Tuple[bytes, str, Dict[str,
     body_end = body_start
     if "content-length" in headers:
         try:
-            length = int(headers["content-length"])
+            length = max(int(headers["content-length"]), 0)
         except ValueError:
             length = 0
         if len(buffer) < body_start + length:
@@ -265,29 +511,146 @@ def extract_http_message(buffer: bytes) -> Optional[Tuple[bytes, str, Dict[str,
         if chunked_end is None:
             return None
         body_end = chunked_end
-    message = buffer[start:body_end]
-    remaining = buffer[body_end:]
-    return message, first_line, headers, remaining
+    return first_line, headers, body_end
+
+
+def record_match_end(match_id: int, start: int, end: int, flags: int, ends: Any) -> None:
+    ends.append(end)
+
+
+def has_start_candidate(ends: Deque[int], offset: int) -> bool:
+    while ends and ends[0] <= offset:
+        ends.popleft()
+    return bool(ends)
+
+
+def iter_mapped_http_spans(view: mmap.mmap) -> Iterator[Tuple[Tuple[int, int], str, Dict[str, str]]]:
+    pos = 0
+    after_message = False
+    header_cache = [-2, -2]
+    scanned = 0
+    start_ends: Deque[int] = deque()
+    if HTTP_START_HS is not None:
+        start_stream = HTTP_START_HS.stream(match_event_handler=record_match_end, context=start_ends)
+    else:
+        start_stream = nullcontext()
+    with start_stream as stream:
+        while True:
+            # A start line directly at the end of the previous message counts, the
+            # same way "^" matches at the front of a chunked buffer.
+            if after_message and HTTP_LINE_RE.match(view, pos):
+                start = pos
+            else:
+                if stream is not None:
+                    # Feed the prefilter only as far as needed to see a candidate past pos.
+                    while not has_start_candidate(start_ends, pos) and scanned < len(view):
+                        stream.scan(view[scanned:scanned + START_SCAN_WINDOW])
+                        scanned += START_SCAN_WINDOW
+                    if not start_ends:
+                        return
+                found = find_next_http_start(view, pos)
+                if not found:
+                    return
+                start = found[0]
+            extracted = extract_http_message(view, start, header_cache)
+            if not extracted:
+                if header_cache == [-1, -1]:
+                    # No header terminator follows, so no later start can complete either.
+                    return
+                # Truncated or malformed body: skip its start line and keep looking.
+                pos = start + 1
+                after_message = False
+                continue
+            first_line, headers, pos = extracted
+            after_message = True
+            yield (start, pos), first_line, headers
 
 
 def iter_http_messages(file_path: str, chunk_size: int = 4 * 1024 * 1024) -> Iterator[Tuple[bytes, str, Dict[str, str]]]:
-    buffer = b""
     with open(file_path, "rb") as f:
-        while True:
+        view = map_input(f)
+        if view is not None:
+            with view:
+                for (start, end), first_line, headers in iter_mapped_http_spans(view):
+                    yield view[start:end], first_line, headers
+            return
+        yield from iter_chunked_http_messages(f, chunk_size)
+
+
+def iter_chunked_http_messages(f: io.BufferedReader, chunk_size: int) -> Iterator[Tuple[bytes, str, Dict[str, str]]]:
+    buffer = bytearray()
+    buffer_offset = 0
+    scan_pos = 0
+    eof = False
+    start_ends: Deque[int] = deque()
+    if HTTP_START_HS is not None:
+        start_stream = HTTP_START_HS.stream(match_event_handler=record_match_end, context=start_ends)
+    else:
+        start_stream = nullcontext()
+    with start_stream as stream:
+        while not eof:
             chunk = f.read(chunk_size)
-            if not chunk:
-                break
-            buffer += chunk
+            if chunk:
+                if stream is not None:
+                    stream.scan(chunk)
+                buffer.extend(chunk)
+            else:
+                eof = True
+            header_cache = [-2, -2]
             while True:
-                extracted = extract_http_message(buffer)
-                if not extracted:
+                found = None
+                if stream is None or has_start_candidate(start_ends, buffer_offset + scan_pos):
+                    found = find_next_http_start(buffer, scan_pos)
+                extracted = extract_http_message(buffer, found[0], header_cache) if found else None
+                if not found or not extracted:
+                    if found and header_cache != [-1, -1] and (eof or len(buffer) > chunk_size * 2):
+                        # The body cannot complete: skip its start line and keep
+                        # looking, as iter_mapped_http_spans does.
+                        scan_pos = found[0] + 1
+                        continue
+                    if found:
+                        # Incomplete message: resume at its leading newline once more data arrives.
+                        scan_pos = max(found[0] - 1, 0)
                     if len(buffer) > chunk_size * 2:
-                        buffer = buffer[-chunk_size:]
+                        trimmed = len(buffer) - chunk_size
+                        del buffer[:trimmed]
+                        buffer_offset += trimmed
+                        scan_pos = max(scan_pos - trimmed, 0)
                     break
-                message, first_line, headers, buffer = extracted
+                first_line, headers, body_end = extracted
+                message = bytes(buffer[found[0]:body_end])
+                del buffer[:body_end]
+                buffer_offset += body_end
+                scan_pos = 0
+                header_cache = [-2, -2]
                 yield message, first_line, headers
 
 
+def split_http_url(target: str) -> Optional[Tuple[str, str, str, str]]:
+    # Covers plain absolute-form targets; anything urlparse treats specially
+    # (userinfo, IPv6 literals and zones, params, fragments, odd ports)
+    # returns None so the caller can fall back to it.
+    if not target.isascii() or URL_SPECIAL_RE.search(target):
+        return None
+    scheme, _, rest = target.partition("://")
+    end = len(rest)
+    for sep in "/?":
+        index = rest.find(sep, 0, end)
+        if index >= 0:
+            end = index
+    authority = rest[:end]
+    path, _, query = rest[end:].partition("?")
+    host, _, port = authority.partition(":")
+    if port:
+        if not port.isdigit() or int(port) > 65535:
+            return None
+        port = str(int(port))
+    path = path or "/"
+    if query:
+        path = f"{path}?{query}"
+    return scheme, host.lower(), port, path
+
+
 def request_metadata(first_line: str, headers: Dict[str, str]) -> Dict[str, str]:
     parts = first_line.split()
     if len(parts) < 2:
@@ -300,15 +663,20 @@ def request_metadata(first_line: str, headers: Dict[str, str]) -> Dict[str, str]
     url = ""
     port = ""
     if target.startswith("http://") or target.startswith("https://"):
-        parsed = urlparse(target)
-        protocol = parsed.scheme
-        host = parsed.hostname or host
-        path = parsed.path or "/"
-        if parsed.query:
-            path = f"{path}?{parsed.query}"
-        if parsed.port:
-            port = str(parsed.port)
+        split = split_http_url(target)
+        if split is not None:
+            protocol, parsed_host, port, path = split
+            host = parsed_host or host
         else:
+            parsed = urlparse(target)
+            protocol = parsed.scheme
+            host = parsed.hostname or host
+            path = parsed.path or "/"
+            if parsed.query:
+                path = f"{path}?{parsed.query}"
+            if parsed.port:
+                port = str(parsed.port)
+        if port in ("", "0"):
             port = "443" if protocol == "https" else "80"
         url = target
     elif host:
@@ -325,107 +693,201 @@ def request_metadata(first_line: str, headers: Dict[str, str]) -> Dict[str, str]
     }
 
 
+def pair_http_messages(
+    messages: Iterable[Tuple[Any, str, Dict[str, str]]],
+    limit: Optional[int],
+) -> Iterator[Tuple[Optional[Tuple[Any, str, Dict[str, str]]], Optional[Tuple[Any, str, Dict[str, str]]]]]:
+    pending_request: Optional[Tuple[Any, str, Dict[str, str]]] = None
+    count_items = 0
+    for message in messages:
+        first_line = message[1]
+        is_request = bool(first_line) and any(first_line.upper().startswith(m.decode("ascii")) for m in HTTP_METHODS)
+        if is_request:
+            if pending_request:
+                yield pending_request, None
+                count_items += 1
+            pending_request = message
+        else:
+            yield pending_request, message
+            pending_request = None
+            count_items += 1
+        if limit is not None and count_items >= limit:
+            return
+    if pending_request:
+        yield pending_request, None
+
+
+def span_message(
+    view: mmap.mmap,
+    message: Optional[Tuple[Tuple[int, int], str, Dict[str, str]]],
+) -> Optional[Tuple[bytes, str, Dict[str, str]]]:
+    if message is None:
+        return None
+    (start, end), first_line, headers = message
+    return view[start:end], first_line, headers
+
+
+WORKER_VIEWS: Dict[str, mmap.mmap] = {}
+
+
+def format_http_items(input_path: str, items: List[Tuple[Any, Any]]) -> bytes:
+    view = WORKER_VIEWS.get(input_path)
+    if view is None:
+        with open(input_path, "rb") as f:
+            view = WORKER_VIEWS[input_path] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    out = io.BytesIO()
+    for request, response in items:
+        write_http_item(out, span_message(view, request), span_message(view, response))
+    return out.getvalue()
+
+
+def write_http_items_threaded(out: BinaryIO, input_path: str, limit: Optional[int]) -> int:
+    # Items are formatted here while a writer thread hands finished fragments
+    # to the file, so disk writes overlap with parsing and formatting. Small
+    # items are batched to keep queue hand-offs (and GIL switches) rare.
+    pending: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=WRITER_QUEUE_SIZE)
+    errors: List[BaseException] = []
+
+    def drain() -> None:
+        while True:
+            fragment = pending.get()
+            if fragment is None:
+                return
+            if errors:
+                continue
+            try:
+                out.write(fragment)
+            except BaseException as exc:
+                # Keep consuming so the producer never blocks on a full queue.
+                errors.append(exc)
+
+    writer = threading.Thread(target=drain, name="xml-writer", daemon=True)
+    writer.start()
+    count = 0
+    fragment = io.BytesIO()
+    try:
+        for request, response in pair_http_messages(iter_http_messages(input_path), limit):
+            if errors:
+                break
+            write_http_item(fragment, request, response)
+            count += 1
+            if fragment.tell() >= WRITER_FRAGMENT_SIZE:
+                pending.put(fragment.getvalue())
+                fragment = io.BytesIO()
+        pending.put(fragment.getvalue())
+    finally:
+        pending.put(None)
+        writer.join()
+    if errors:
+        raise errors[0]
+    return count
+
+
+def write_http_items_parallel(out: BinaryIO, input_path: str, limit: Optional[int], workers: int) -> Optional[int]:
+    with open(input_path, "rb") as f:
+        view = map_input(f)
+    if view is None:
+        return None
+    count_items = 0
+    pending: Deque[Future] = deque()
+    with view, ProcessPoolExecutor(max_workers=workers) as executor:
+        items = pair_http_messages(iter_mapped_http_spans(view), limit)
+        while True:
+            group = list(islice(items, PARALLEL_GROUP_SIZE))
+            if not group:
+                break
+            pending.append(executor.submit(format_http_items, input_path, group))
+            count_items += len(group)
+            # Keep a bounded number of groups in flight and write them in order.
+            if len(pending) >= workers * 4:
+                out.write(pending.popleft().result())
+        while pending:
+            out.write(pending.popleft().result())
+    return count_items
+
+
 def write_http_messages_as_xml(
     input_path: str,
     output_path: str,
     limit: Optional[int],
     issue_limit: Optional[int],
+    workers: int = 1,
 ) -> int:
-    pending_request: Optional[Tuple[bytes, str, Dict[str, str]]] = None
-    count_items = 0
-    issues = collect_issues(input_path, issue_limit)
-    with open(output_path, "w", encoding="utf-8") as out:
-        out.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        out.write("<burpExport>\n")
-        out.write("  <items>\n")
-        for message, first_line, headers in iter_http_messages(input_path):
-            is_request = bool(first_line) and any(first_line.upper().startswith(m.decode("ascii")) for m in HTTP_METHODS)
-            if is_request:
-                if pending_request:
-                    write_http_item(out, pending_request, None)
-                    count_items += 1
-                pending_request = (message, first_line, headers)
-            else:
-                if pending_request:
-                    write_http_item(out, pending_request, (message, first_line, headers))
-                    pending_request = None
-                else:
-                    write_http_item(out, None, (message, first_line, headers))
-                count_items += 1
-            if limit is not None and count_items >= limit:
-                break
-        if pending_request and (limit is None or count_items < limit):
-            write_http_item(out, pending_request, None)
-            count_items += 1
-        out.write("  </items>\n")
-        if issues:
-            out.write("  <issues>\n")
-            for issue in issues:
-                out.write("    <issue>\n")
-                for tag, value in issue.items():
-                    if tag == "raw":
-                        out.write(f'      <raw base64="true">{value}</raw>\n')
-                        continue
-                    if SAFE_TAG_RE.match(tag):
-                        out.write(f"      <{tag}>{escape(sanitize_xml_text(value))}</{tag}>\n")
-                    else:
-                        out.write(
-                            f'      <field name="{escape(sanitize_xml_text(tag))}">'
-                            f"{escape(sanitize_xml_text(value))}</field>\n"
-                        )
-                out.write("    </issue>\n")
-            out.write("  </issues>\n")
-        out.write("</burpExport>\n")
+    with open(output_path, "wb", buffering=OUTPUT_BUFFER_SIZE) as out:
+        out.write(XML_DECLARATION)
+        out.write(b"<burpExport>\n")
+        out.write(b"  <items>\n")
+        count_items = None
+        if workers > 1:
+            count_items = write_http_items_parallel(out, input_path, limit, workers)
+        if count_items is None:
+            count_items = write_http_items_threaded(out, input_path, limit)
+        out.write(b"  </items>\n")
+        issues = iter_issues(input_path, issue_limit)
+        first_issue = next(issues, None)
+        if first_issue is not None:
+            out.write(b"  <issues>\n")
+            for issue in chain((first_issue,), issues):
+                write_issue(out, issue)
+            out.write(b"  </issues>\n")
+        out.write(b"</burpExport>\n")
     return count_items
 
 
+def write_issue(out: BinaryIO, issue: Dict[str, str]) -> None:
+    out.write(b"    <issue>\n")
+    for tag, value in issue.items():
+        if tag == "raw":
+            out.write(b'      <raw base64="true">' + value.encode("ascii") + b"</raw>\n")
+            continue
+        if SAFE_TAG_RE.match(tag):
+            out.write(f"      <{tag}>".encode("utf-8") + xml_text(value) + f"</{tag}>\n".encode("utf-8"))
+        else:
+            out.write(b'      <field name="' + xml_text(tag) + b'">' + xml_text(value) + b"</field>\n")
+    out.write(b"    </issue>\n")
+
+
 def write_http_item(
-    out: io.TextIOBase,
+    out: BinaryIO,
     request: Optional[Tuple[bytes, str, Dict[str, str]]],
     response: Optional[Tuple[bytes, str, Dict[str, str]]],
 ) -> None:
-    out.write("  <item>\n")
+    out.write(b"  <item>\n")
     if request:
         req_bytes, req_line, req_headers = request
         meta = request_metadata(req_line, req_headers)
-        if meta.get("url"):
-            out.write(f"    <url>{escape(sanitize_xml_text(meta['url']))}</url>\n")
-        if meta.get("host"):
-            out.write(f"    <host>{escape(sanitize_xml_text(meta['host']))}</host>\n")
-        if meta.get("port"):
-            out.write(f"    <port>{escape(sanitize_xml_text(meta['port']))}</port>\n")
-        if meta.get("protocol"):
-            out.write(f"    <protocol>{escape(sanitize_xml_text(meta['protocol']))}</protocol>\n")
-        if meta.get("method"):
-            out.write(f"    <method>{escape(sanitize_xml_text(meta['method']))}</method>\n")
-        if meta.get("path"):
-            out.write(f"    <path>{escape(sanitize_xml_text(meta['path']))}</path>\n")
-        req_header, req_body = split_http_message(req_bytes)
+        for name, open_tag, close_tag in REQUEST_META_TAGS:
+            value = meta.get(name)
+            if value:
+                out.write(open_tag + xml_text(value) + close_tag)
         if is_mostly_printable(req_bytes):
-            req_text = req_bytes.decode("latin-1", "replace")
-            out.write(f"    <request>{escape(sanitize_xml_text(req_text))}</request>\n")
+            out.write(b"    <request>")
+            out.write(xml_text(req_bytes.decode("latin-1", "replace")))
+            out.write(b"</request>\n")
         else:
-            req_b64 = base64.b64encode(req_bytes).decode("ascii")
-            out.write(f'    <request base64="true">{req_b64}</request>\n')
-        out.write(f"    <requestLength>{len(req_bytes)}</requestLength>\n")
+            out.write(b'    <request base64="true">')
+            out.write(b64encode(req_bytes))
+            out.write(b"</request>\n")
+        out.write(b"    <requestLength>%d</requestLength>\n" % len(req_bytes))
     if response:
         resp_bytes, resp_line, resp_headers = response
-        resp_header, resp_body = split_http_message(resp_bytes)
         if resp_line:
             parts = resp_line.split()
             if len(parts) >= 2:
-                out.write(f"    <status>{escape(sanitize_xml_text(parts[1]))}</status>\n")
+                out.write(b"    <status>" + xml_text(parts[1]) + b"</status>\n")
         content_type = resp_headers.get("content-type")
         if content_type:
-            out.write(f"    <mimeType>{escape(sanitize_xml_text(content_type))}</mimeType>\n")
+            out.write(b"    <mimeType>" + xml_text(content_type) + b"</mimeType>\n")
         if is_mostly_printable(resp_bytes):
-            resp_text = resp_bytes.decode("latin-1", "replace")
-            out.write(f"    <response>{escape(sanitize_xml_text(resp_text))}</response>\n")
+            out.write(b"    <response>")
+            out.write(xml_text(resp_bytes.decode("latin-1", "replace")))
+            out.write(b"</response>\n")
         else:
-            resp_b64 = base64.b64encode(resp_bytes).decode("ascii")
-            out.write(f'    <response base64="true">{resp_b64}</response>\n')
-        out.write(f"    <responseLength>{len(resp_bytes)}</responseLength>\n")
-    out.write("  </item>\n")
+            out.write(b'    <response base64="true">')
+            out.write(b64encode(resp_bytes))
+            out.write(b"</response>\n")
+        out.write(b"    <responseLength>%d</responseLength>\n" % len(resp_bytes))
+    out.write(b"  </item>\n")
 
 
 def build_default_output_path(input_path: str) -> str:
@@ -457,44 +919,63 @@ def main() -> None:
         type=int,
         help="Limit number of exported issues (raw extraction mode).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes used to format HTTP items (raw extraction mode).",
+    )
     args = parser.parse_args()
 
     input_path = args.input
     output_path = args.output or build_default_output_path(input_path)
 
-    with open(input_path, "rb") as f:
-        raw = f.read()
-
-    kind, payload = detect_payload(raw)
-
-    if kind == "xml":
-        with open(output_path, "wb") as out:
-            out.write(payload)
-        return
-
-    if kind == "zip":
-        xml_payload = extract_xml_from_zip(payload)
-        if not xml_payload:
-            raise SystemExit("No XML found inside ZIP payload.")
-        with open(output_path, "wb") as out:
-            out.write(xml_payload)
-        return
-
-    if kind == "sqlite":
-        tmp_path = None
-        try:
-            with tempfile.NamedTemporaryFile(delete=False) as tmp:
-                tmp.write(payload)
-                tmp_path = tmp.name
-            conn = sqlite3.connect(tmp_path)
-            write_sqlite_as_xml(conn, output_path, args.table)
-            conn.close()
-        finally:
-            if tmp_path and os.path.exists(tmp_path):
-                os.remove(tmp_path)
-        return
-
-    exported = write_http_messages_as_xml(input_path, output_path, args.limit, args.issue_limit)
+    in_place = os.path.exists(output_path) and os.path.samefile(input_path, output_path)
+    with open(input_path, "rb") as input_file:
+        source: io.BufferedIOBase = input_file
+        buffered = not source.seekable()
+        if buffered:
+            # Pipes and FIFOs can be read only once, so keep the whole payload.
+            source = io.BytesIO(source.read())
+        compressed = is_gzip_stream(source)
+        f: io.BufferedIOBase = gzip.GzipFile(fileobj=source) if compressed else source
+        kind = detect_payload(f)
+
+        if kind == "xml":
+            if in_place:
+                # Opening the output would truncate the input before it is copied.
+                f = io.BytesIO(f.read())
+            with open(output_path, "wb") as out:
+                shutil.copyfileobj(f, out, OUTPUT_BUFFER_SIZE)
+            return
+
+        if kind == "zip":
+            # ZipFile seeks from the end, which GzipFile does not support.
+            xml_payload = extract_xml_from_zip(io.BytesIO(f.read()) if compressed else f)
+            if not xml_payload:
+                raise SystemExit("No XML found inside ZIP payload.")
+            with open(output_path, "wb") as out:
+                out.write(xml_payload)
+            return
+
+        if kind == "sqlite":
+            tmp_path = None
+            try:
+                # Plain databases are read where they are; compressed or piped
+                # ones (or ones about to be overwritten by the output) need a copy.
+                if compressed or buffered or in_place:
+                    with tempfile.NamedTemporaryFile(delete=False) as tmp:
+                        shutil.copyfileobj(f, tmp, OUTPUT_BUFFER_SIZE)
+                        tmp_path = tmp.name
+                conn = open_sqlite_readonly(tmp_path or input_path)
+                write_sqlite_as_xml(conn, output_path, args.table)
+                conn.close()
+            finally:
+                if tmp_path and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            return
+
+    exported = write_http_messages_as_xml(input_path, output_path, args.limit, args.issue_limit, args.workers)
     if exported == 0:
         raise SystemExit("Unsupported .burp format. Expected XML, ZIP-with-XML, SQLite, or raw HTTP data.")
 